@@ -20,8 +20,10 @@ if str(_project_root) not in sys.path:
     sys.path.insert(0, str(_project_root))
 
 from src.ai.azure_openai import AzureOpenAIProvider  # noqa: E402
+from src.ai.base import AIProvider  # noqa: E402
+from src.ai.semantic_cache import SemanticAIProvider  # noqa: E402
 from src.bilibili.client import BilibiliClient  # noqa: E402
-from src.bot.cache import SummaryCache  # noqa: E402
+from src.bot.cache import SummaryCache, run_coarse_clock  # noqa: E402
 from src.bot.monitor import AtMonitor  # noqa: E402
 from src.bot.processor import MessageProcessor  # noqa: E402
 from src.config.keyvault import KeyVaultSecretProvider  # noqa: E402
@@ -63,18 +65,18 @@ async def main() -> None:
     keyvault_provider = KeyVaultSecretProvider(
         vault_url=config.keyvault.vault_url,
     )
-    api_key = keyvault_provider.get_secret(
+    secret_names = [
         config.keyvault.api_key_secret_name,
-    )
-    sessdata = keyvault_provider.get_secret(
         config.keyvault.sessdata_secret_name,
-    )
-    bili_jct = keyvault_provider.get_secret(
         config.keyvault.bili_jct_secret_name,
-    )
-    uid = int(keyvault_provider.get_secret(
         config.keyvault.uid_secret_name,
-    ))
+    ]
+    # 并发预取，启动耗时从 4 次往返降为 1 次
+    await keyvault_provider.prefetch(secret_names)
+    api_key, sessdata, bili_jct, uid_text = (
+        keyvault_provider.get_secret(name) for name in secret_names
+    )
+    uid = int(uid_text)
     logger.info("已从 Key Vault 获取所有密钥 (API Key, SESSDATA, bili_jct, UID)")
 
     # Adapter: B站 API 客户端
@@ -85,12 +87,35 @@ async def main() -> None:
     )
 
     # Strategy: AI 提供商
-    ai_provider = AzureOpenAIProvider(
+    azure_provider = AzureOpenAIProvider(
         endpoint=config.azure_openai.endpoint,
         api_key=api_key,
         deployment=config.azure_openai.deployment,
         api_version=config.azure_openai.api_version,
+        embedding_deployment=config.azure_openai.embedding_deployment,
+        cache_ttl=config.bot.cache_ttl,
+        cache_max_size=config.bot.cache_max_size,
+        max_output_chars=config.bot.max_reply_chars,
     )
+    ai_provider: AIProvider = azure_provider
+
+    # Decorator: 语义缓存（配置了 Embedding 部署才启用）
+    semantic_provider: SemanticAIProvider | None = None
+    if config.azure_openai.embedding_deployment:
+        semantic_provider = SemanticAIProvider(
+            azure_provider,
+            embedder=azure_provider.embed,
+            namespace=azure_provider.deployment,
+            threshold=config.bot.semantic_cache_threshold,
+            ttl=config.bot.cache_ttl,
+            max_size=config.bot.cache_max_size,
+        )
+        ai_provider = semantic_provider
+        logger.info(
+            "已启用语义缓存: embedding=%s, 阈值=%.2f",
+            config.azure_openai.embedding_deployment,
+            config.bot.semantic_cache_threshold,
+        )
 
     # Proxy: 缓存
     cache = SummaryCache(
@@ -113,16 +138,24 @@ async def main() -> None:
         bili_client=bili_client,
         processor=processor,
         poll_interval=config.bot.poll_interval,
+        max_concurrency=config.bot.max_concurrency,
     )
 
+    # 缓存使用的粗粒度时钟（每秒刷新）
+    clock_task = asyncio.create_task(run_coarse_clock())
+
     # 4. 优雅关闭
     async def shutdown() -> None:
         logger.info("正在关闭...")
         await monitor.stop()
+        clock_task.cancel()
         await bili_client.close()
         await ai_provider.close()
         keyvault_provider.close()
         logger.info("已关闭, 缓存统计: %s", cache.stats)
+        logger.info("AI 精确缓存统计: %s", azure_provider.cache_stats)
+        if semantic_provider is not None:
+            logger.info("语义缓存统计: %s", semantic_provider.stats)
 
     # 注册信号处理
     loop = asyncio.get_running_loop()
@@ -141,6 +174,9 @@ async def main() -> None:
         config.bot.cache_ttl,
     )
 
+    # 预热连接池，首条 @通知不再承担 DNS + TLS 握手延迟
+    await asyncio.gather(bili_client.warmup(), ai_provider.warmup())
+
     try:
         await monitor.run()
     except KeyboardInterrupt:
@@ -5,75 +5,120 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
+import re
 
-from openai import APIConnectionError, APITimeoutError, AsyncAzureOpenAI
-from tenacity import (
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
+import httpx
+from openai import (
+    APIConnectionError,
+    AsyncAzureOpenAI,
+    AsyncStream,
+    DefaultAsyncHttpxClient,
 )
+from openai.types.chat import ChatCompletionChunk
 
 from src.ai.base import AIProvider
+from src.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
-_SYSTEM_PROMPT_SUMMARY = """你是一个 B站视频内容总结助手。
-用户会给你一个视频的标题、简介和带时间戳的字幕内容，请你生成一个带时间线的总结。
+# 语义缓存使用的向量维度（text-embedding-3 系列支持降维，256 维足够区分相似度）
+_EMBEDDING_DIMENSIONS = 256
+
+# 单次回复的最大生成 token 数
+_MAX_COMPLETION_TOKENS = 800
+
+# 重试交给 SDK 内置机制：只重试连接错误、超时、429 和 5xx，
+# 并优先按服务端返回的 retry-after-ms / Retry-After 等待（带随机抖动）
+_MAX_RETRIES = 3
+
+# 流式读取过程中连接中断 / 超时的重试次数（SDK 不会重试已开始读取的响应）
+_STREAM_RETRIES = 2
+
+# 连接池：重试和后续请求复用已建立的 TLS 连接，HTTP/2 多路复用并发请求
+_HTTP_LIMITS = httpx.Limits(
+    max_keepalive_connections=16,
+    max_connections=32,
+    keepalive_expiry=60.0,
+)
+
+# ── Prompt ────────────────────────────────────────────────────
+# 消息顺序：通用系统提示 → 视频上下文 → 任务指令 → 用户请求
+# 总结和问答共享前两段（逐字节相同），Azure OpenAI 的自动 prompt 缓存
+# 可以在两类请求之间命中同一前缀，长字幕的 prefill 只需计算一次。
+
+_SYSTEM_PROMPT_COMMON = """你是一个 B站视频内容助手。
+用户会给你一个视频的标题、简介和带时间戳的字幕内容，随后的任务指令会说明需要总结视频还是回答问题。
 
 【核心原则 — 最高优先级】
-- 你只能基于提供的字幕内容进行总结，严禁编造、推测或脑补任何未在字幕中出现的信息
-- 如果字幕内容缺失、极少（例如只有几句话）、不完整或无实质内容，你必须直接回复：
-  "该视频字幕内容不足，无法生成有效总结 😅 建议直接观看视频~"
+- 你只能基于提供的字幕内容进行总结或回答，严禁编造、推测或脑补任何未在字幕中出现的信息
 - 不要试图根据视频标题或简介去猜测、扩展或编造视频的具体内容
-- 如果字幕中只有背景音乐描述、语气词、或无意义的片段，同样视为无有效内容
+- 如果字幕中只有背景音乐描述、语气词、或无意义的片段，视为无有效内容
 
 【格式要求】
 - 这是B站评论区，不支持任何 Markdown 语法！
 - 禁止使用 **粗体**、*斜体*、# 标题、- 列表 等 Markdown 格式
-- 必须在每个要点前标注时间戳，格式如 00:00 或 1:23:45
-- B站评论区的时间戳格式可以被点击跳转，所以务必准确标注
-- 每个要点独占一行，保持简洁
+- B站评论区的时间戳（如 00:00 或 1:23:45）可以被点击跳转，所以务必准确标注
 - 适合手机端阅读
 
-【时间戳格式示例】
-00:00 开场介绍主题
-02:15 第一个核心观点
-05:30 案例分析
-08:45 总结和结论
+【通用要求】
+- 每一个总结要点或回答都必须有字幕原文作为依据
+- 语气友好自然，像热心的 B站用户
+- 不要提及"字幕"、"根据字幕"等词汇"""
 
-【内容要求】
+_TASK_PROMPT_SUMMARY = """【本次任务：生成带时间线的视频总结】
+- 如果字幕内容缺失、极少（例如只有几句话）、不完整或无实质内容，你必须直接回复：
+  "该视频字幕内容不足，无法生成有效总结 😅 建议直接观看视频~"
+- 必须在每个要点前标注时间戳，格式如 00:00 或 1:23:45
+- 每个要点独占一行，保持简洁
 - 总结控制在 300 字以内
 - 提炼 4-6 个关键时间节点
 - 时间戳要尽量精确到相关内容开始的位置
-- 每一个总结要点都必须有字幕原文作为依据
-- 语气友好自然，像热心的 B站用户
-- 不要提及"字幕"、"根据字幕"等词汇"""
 
-_SYSTEM_PROMPT_QA = """你是一个 B站视频内容问答助手。
-用户会给你一个视频的标题、简介和带时间戳的字幕内容，以及一个具体的问题。
+【时间戳格式示例】
+00:00 开场介绍主题
+02:15 第一个核心观点
+05:30 案例分析
+08:45 总结和结论"""
 
-【核心原则 — 最高优先级】
-- 你只能基于提供的字幕内容来回答问题，严禁编造、推测或脑补任何未在字幕中出现的信息
+_TASK_PROMPT_QA = """【本次任务：回答用户关于视频的问题】
 - 如果字幕内容缺失、极少、不完整或无实质内容，你必须直接回复：
   "该视频字幕内容不足，无法回答你的问题 😅 建议直接观看视频~"
-- 不要试图根据视频标题或简介去猜测答案
 - 如果用户的问题在字幕中找不到相关信息，诚实说明视频中未提及该内容
-
-【格式要求】
-- 这是B站评论区，不支持任何 Markdown 语法！
-- 禁止使用 **粗体**、*斜体*、# 标题 等 Markdown 格式
 - 如果答案在视频特定位置，请标注时间戳（如 05:30）方便跳转
 - 直接用纯文本回答，可用 emoji 点缀
-- 适合手机端阅读
+- 回答控制在 250 字以内"""
 
-【内容要求】
-- 回答控制在 250 字以内
-- 如果能定位到具体时间点，请标注时间戳
-- 每一个回答都必须有字幕原文作为依据
-- 语气友好自然，像热心的 B站用户
-- 不要提及"字幕"、"根据字幕"等词汇"""
+_SUMMARY_REQUEST = "请总结这个视频。"
+
+# ── 上下文压缩 ────────────────────────────────────────────────
+# 发送前去掉冗余内容以减少 prompt tokens（费用和首字延迟都与其近似线性）
+
+# 字幕部分的起始标记（见 VideoContext.to_prompt），只压缩其后的内容
+_SUBTITLE_MARKER = "视频字幕内容：\n"
+_HORIZONTAL_SPACE_RE = re.compile(r"[ \t\u3000]+")
+
+
+def _compress_context(text: str) -> str:
+    """压缩视频上下文中的字幕部分：合并多余空白并去掉空行.
+
+    标题、UP主、简介等原样保留。语气词和重复条目的去除在解析字幕时
+    按真实的条目边界完成（见 bilibili.client._parse_subtitle），
+    这里只处理空白，不按空格拆分单词，避免误删英文等空格分词字幕中的词。
+    """
+    head, sep, subtitle = text.partition(_SUBTITLE_MARKER)
+    if not sep:
+        return text
+
+    lines = []
+    for raw_line in subtitle.split("\n"):
+        line = _HORIZONTAL_SPACE_RE.sub(" ", raw_line).strip()
+        if line:
+            lines.append(line)
+    return head + sep + "\n".join(lines)
 
 
 class AzureOpenAIProvider(AIProvider):
@@ -88,71 +133,236 @@ class AzureOpenAIProvider(AIProvider):
         api_key: str,
         deployment: str,
         api_version: str = "2025-01-01-preview",
+        embedding_deployment: str = "",
+        cache_ttl: int = 86400,
+        cache_max_size: int = 500,
+        max_output_chars: int = 0,
     ) -> None:
         self._deployment = deployment
+        # 单次输出的最大字符数（0 表示不限制），超过后提前结束流式生成
+        self._max_output_chars = max_output_chars
+        self._embedding_deployment = embedding_deployment
+        # 精确匹配缓存: key -> 回复（FIFO + TTL）
+        self._exact_cache: TTLCache[str, str] = TTLCache(cache_ttl, cache_max_size)
+        self._cache_hits = 0
+        self._cache_misses = 0
         self._client = AsyncAzureOpenAI(
             azure_endpoint=endpoint,
             api_key=api_key,
             api_version=api_version,
+            max_retries=_MAX_RETRIES,
+            http_client=DefaultAsyncHttpxClient(
+                limits=_HTTP_LIMITS,
+                http2=True,
+            ),
         )
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(min=2, max=15),
-        retry=retry_if_exception_type((APIConnectionError, APITimeoutError)),
-    )
     async def summarize_video(self, video_context: str) -> str:
         """调用 Azure OpenAI 生成视频总结."""
-        logger.debug("调用 AI 生成总结, 上下文长度: %d", len(video_context))
-
-        response = await self._client.chat.completions.create(
-            model=self._deployment,
-            messages=[
-                {"role": "system", "content": _SYSTEM_PROMPT_SUMMARY},
-                {"role": "user", "content": video_context},
-            ],
-            max_completion_tokens=800,
-            temperature=0.3,
+        compressed = _compress_context(video_context)
+        logger.debug(
+            "调用 AI 生成总结, 上下文长度: %d (压缩前 %d)",
+            len(compressed),
+            len(video_context),
         )
-
-        result = response.choices[0].message.content or ""
-        logger.info(
-            "AI 总结生成完成, tokens: prompt=%s completion=%s",
-            response.usage.prompt_tokens if response.usage else "?",
-            response.usage.completion_tokens if response.usage else "?",
+        return await self._cached_complete(
+            "总结",
+            _TASK_PROMPT_SUMMARY,
+            compressed,
+            _SUMMARY_REQUEST,
+            temperature=0.3,
         )
-        return result.strip()
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(min=2, max=15),
-        retry=retry_if_exception_type((APIConnectionError, APITimeoutError)),
-    )
     async def answer_question(
         self, video_context: str, question: str
     ) -> str:
         """调用 Azure OpenAI 回答关于视频的问题."""
         logger.debug("调用 AI 回答问题: %s", question[:50])
+        return await self._cached_complete(
+            "回答",
+            _TASK_PROMPT_QA,
+            _compress_context(video_context),
+            f"用户问题：{question}",
+            temperature=0.5,
+        )
 
-        user_message = f"{video_context}\n\n用户问题：{question}"
+    # ── 精确匹配缓存 ──────────────────────────────────────────
 
-        response = await self._client.chat.completions.create(
-            model=self._deployment,
-            messages=[
-                {"role": "system", "content": _SYSTEM_PROMPT_QA},
-                {"role": "user", "content": user_message},
-            ],
-            max_completion_tokens=800,
-            temperature=0.5,
+    async def _cached_complete(
+        self,
+        label: str,
+        task_prompt: str,
+        video_context: str,
+        request: str,
+        *,
+        temperature: float,
+    ) -> str:
+        """先查精确匹配缓存，未命中再调用 API 并写入缓存."""
+        key = self._cache_key(task_prompt, video_context, request, temperature)
+        cached = self._exact_cache.get(key)
+        if cached is not None:
+            self._cache_hits += 1
+            logger.info("AI %s命中精确缓存 (hits=%d)", label, self._cache_hits)
+            return cached
+
+        self._cache_misses += 1
+        result = await self._complete(
+            label, task_prompt, video_context, request, temperature=temperature
         )
+        self._exact_cache.put(key, result)
+        return result
+
+    def _cache_key(
+        self,
+        task_prompt: str,
+        video_context: str,
+        request: str,
+        temperature: float,
+    ) -> str:
+        """由模型、prompt 和采样参数计算 SHA-256 缓存键."""
+        payload = json.dumps(
+            {
+                "m": self._deployment,
+                "s": _SYSTEM_PROMPT_COMMON + task_prompt,
+                "c": video_context,
+                "u": request,
+                "t": temperature,
+                "mt": _MAX_COMPLETION_TOKENS,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @property
+    def cache_stats(self) -> dict[str, int]:
+        """返回精确匹配缓存统计信息."""
+        return {
+            "size": len(self._exact_cache),
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+        }
+
+    # ── API 调用 ──────────────────────────────────────────────
+
+    async def _complete(
+        self,
+        label: str,
+        task_prompt: str,
+        video_context: str,
+        request: str,
+        *,
+        temperature: float,
+    ) -> str:
+        """流式调用 Chat Completions 接口（稳定前缀在前，任务相关内容在后）.
+
+        SDK 的 max_retries 只覆盖建立响应阶段；读取流的过程中连接中断或超时
+        不会被重试，这里整体重新发起请求，最多 _STREAM_RETRIES 次。
+        """
+        messages = [
+            {"role": "system", "content": _SYSTEM_PROMPT_COMMON},
+            {"role": "user", "content": video_context},
+            {"role": "system", "content": task_prompt},
+            {"role": "user", "content": request},
+        ]
+        attempt = 0
+        while True:
+            stream = await self._client.chat.completions.create(
+                model=self._deployment,
+                messages=messages,
+                max_completion_tokens=_MAX_COMPLETION_TOKENS,
+                temperature=temperature,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            try:
+                return await self._consume_stream(label, stream)
+            except (APIConnectionError, httpx.TransportError):
+                attempt += 1
+                if attempt > _STREAM_RETRIES:
+                    raise
+                logger.warning(
+                    "AI %s流式响应中断，%d 秒后重试 (%d/%d)",
+                    label,
+                    attempt,
+                    attempt,
+                    _STREAM_RETRIES,
+                    exc_info=True,
+                )
+                await asyncio.sleep(attempt)
+
+    async def _consume_stream(
+        self, label: str, stream: AsyncStream[ChatCompletionChunk]
+    ) -> str:
+        """累积流式输出.
+
+        输出超过 max_output_chars 时提前关闭流，
+        超出部分反正会被回复截断，不必再为其付费等待。
+        """
+        chunks: list[str] = []
+        total_chars = 0
+        usage = None
+        try:
+            async for event in stream:
+                # usage 在最后一个（choices 为空的）事件中返回
+                if event.usage is not None:
+                    usage = event.usage
+                if not event.choices:
+                    continue
+                delta = event.choices[0].delta.content
+                if not delta:
+                    continue
+                chunks.append(delta)
+                total_chars += len(delta)
+                if self._max_output_chars and total_chars >= self._max_output_chars:
+                    logger.info(
+                        "AI %s输出已达 %d 字，提前结束生成",
+                        label,
+                        self._max_output_chars,
+                    )
+                    break
+        finally:
+            await stream.close()
 
-        result = response.choices[0].message.content or ""
         logger.info(
-            "AI 回答生成完成, tokens: prompt=%s completion=%s",
-            response.usage.prompt_tokens if response.usage else "?",
-            response.usage.completion_tokens if response.usage else "?",
+            "AI %s生成完成, tokens: prompt=%s completion=%s",
+            label,
+            usage.prompt_tokens if usage else "?",
+            usage.completion_tokens if usage else "?",
+        )
+        return "".join(chunks).strip()
+
+    @property
+    def deployment(self) -> str:
+        """模型部署名称."""
+        return self._deployment
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        """调用 Azure OpenAI Embedding 接口批量生成文本向量.
+
+        Args:
+            texts: 待向量化的文本列表。
+
+        Returns:
+            与输入一一对应的向量列表。
+        """
+        if not self._embedding_deployment:
+            raise RuntimeError("未配置 embedding_deployment，无法生成向量")
+
+        response = await self._client.embeddings.create(
+            model=self._embedding_deployment,
+            input=texts,
+            dimensions=_EMBEDDING_DIMENSIONS,
         )
-        return result.strip()
+        return [item.embedding for item in response.data]
+
+    async def warmup(self) -> None:
+        """预热连接池：用轻量的 models.list 提前建立 TLS 连接."""
+        try:
+            await self._client.models.list()
+            logger.debug("Azure OpenAI 连接预热完成")
+        except Exception:
+            logger.warning("Azure OpenAI 连接预热失败", exc_info=True)
 
     async def close(self) -> None:
         """关闭 Azure OpenAI 客户端."""
@@ -43,6 +43,9 @@ class AIProvider(ABC):
             AI 生成的回答文本。
         """
 
+    async def warmup(self) -> None:  # noqa: B027
+        """预热连接（可选实现，默认不做任何事）."""
+
     @abstractmethod
     async def close(self) -> None:
         """释放资源."""
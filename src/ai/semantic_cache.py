@@ -0,0 +1,189 @@
+"""语义缓存 — Decorator 模式包装 AI 提供商.
+
+对问答请求做向量化并与同一视频的历史问答比较余弦相似度，相似度超过
+阈值时直接返回缓存的回答，同一视频下换个说法的问题不再重复调用大模型。
+
+@see https://refactoring.guru/design-patterns/decorator
+
+实现要点：
+- 向量归一化后内积即余弦相似度（等价于 FAISS IndexFlatIP 暴力检索）
+- 只缓存问答：同一视频的重复总结已由按 bvid 缓存的 SummaryCache 拦截，
+  能到达这一层的总结请求必然是另一个视频，语义命中只会张冠李戴
+- 按 (部署名, 视频标题, UP主) 划分作用域，不同模型、不同视频（如同系列的
+  不同分集）互不命中；作用域已锁定视频，因此只需向量化问题本身
+- 完全相同的问题先按摘要精确匹配，省去一次 embedding 调用
+- TTL + 容量上限控制内存
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import operator
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from src.ai.base import AIProvider
+from src.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# 批量向量化函数：输入文本列表，返回对应的向量列表
+Embedder = Callable[[list[str]], Awaitable[list[list[float]]]]
+
+
+@dataclass(slots=True)
+class _Entry:
+    """一条语义缓存条目."""
+
+    scope: str  # 视频作用域，只与同一视频的请求比较
+    vector: list[float]  # 问题的归一化向量
+    response: str
+
+
+class _VectorStore:
+    """向量存储（暴力内积检索 + TTL + FIFO 淘汰）.
+
+    以文本摘要为键存入 TTLCache，同时支持不调用 embedding 的精确匹配查询。
+    """
+
+    def __init__(self, ttl: int, max_size: int) -> None:
+        self._entries: TTLCache[str, _Entry] = TTLCache(ttl, max_size)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_exact(self, digest: str) -> _Entry | None:
+        """按文本摘要精确查找未过期条目."""
+        return self._entries.get(digest)
+
+    def search(
+        self, scope: str, vector: list[float]
+    ) -> tuple[float, _Entry | None]:
+        """在同一作用域内查找最相似的未过期条目，返回 (相似度, 条目)."""
+        best_score = -1.0
+        best: _Entry | None = None
+        for entry in self._entries.values():
+            if entry.scope != scope:
+                continue
+            score = sum(map(operator.mul, vector, entry.vector))
+            if score > best_score:
+                best_score = score
+                best = entry
+        return best_score, best
+
+    def add(
+        self, digest: str, scope: str, vector: list[float], response: str
+    ) -> None:
+        """写入条目，超出容量时淘汰最早写入的条目."""
+        self._entries.put(digest, _Entry(scope, vector, response))
+
+
+def _video_scope(namespace: str, video_context: str) -> str:
+    """由部署名和上下文前两行（视频标题、UP主，见 VideoContext.to_prompt）计算作用域."""
+    header = "\n".join(video_context.split("\n", 2)[:2])
+    return hashlib.sha256(f"{namespace}\x00{header}".encode()).hexdigest()
+
+
+def _normalize(vector: list[float]) -> list[float]:
+    """L2 归一化，使内积等于余弦相似度."""
+    norm = math.sqrt(sum(x * x for x in vector))
+    if norm == 0:
+        return vector
+    return [x / norm for x in vector]
+
+
+class SemanticAIProvider(AIProvider):
+    """带语义缓存的 AI 提供商装饰器.
+
+    保持 AIProvider 策略接口不变，可无缝替换被包装的提供商。
+
+    使用方式：
+        provider = SemanticAIProvider(azure_provider, embedder=azure_provider.embed)
+    """
+
+    def __init__(
+        self,
+        provider: AIProvider,
+        embedder: Embedder,
+        *,
+        namespace: str = "",
+        threshold: float = 0.92,
+        ttl: int = 86400,
+        max_size: int = 500,
+    ) -> None:
+        """初始化语义缓存.
+
+        Args:
+            provider:  被包装的 AI 提供商。
+            embedder:  批量向量化函数。
+            namespace: 缓存命名空间（一般为模型部署名），不同模型互不命中。
+            threshold: 余弦相似度命中阈值。
+            ttl:       缓存过期时间（秒）。
+            max_size:  最大缓存条数。
+        """
+        self._provider = provider
+        self._embed = embedder
+        self._namespace = namespace
+        self._threshold = threshold
+        self._store = _VectorStore(ttl, max_size)
+        self._hits = 0
+        self._misses = 0
+
+    async def summarize_video(self, video_context: str) -> str:
+        """总结请求不走语义缓存，直接调用被包装的提供商."""
+        return await self._provider.summarize_video(video_context)
+
+    async def answer_question(
+        self, video_context: str, question: str
+    ) -> str:
+        """优先返回同一视频下语义相似问题的缓存回答，未命中再调用 AI."""
+        scope = _video_scope(self._namespace, video_context)
+        store = self._store
+
+        # 完全相同的问题无需向量化，直接命中
+        digest = hashlib.sha256(f"{scope}\x00{question}".encode()).hexdigest()
+        exact = store.get_exact(digest)
+        if exact is not None:
+            self._hits += 1
+            logger.info("语义缓存精确命中 (hits=%d)", self._hits)
+            return exact.response
+
+        try:
+            (embedding,) = await self._embed([question])
+            vector = _normalize(embedding)
+        except Exception:
+            # 向量化失败不影响主流程，直接调用 AI
+            logger.warning("向量化失败，跳过语义缓存", exc_info=True)
+            return await self._provider.answer_question(video_context, question)
+
+        score, entry = store.search(scope, vector)
+        if entry is not None and score >= self._threshold:
+            self._hits += 1
+            logger.info(
+                "语义缓存命中: score=%.3f (hits=%d)", score, self._hits
+            )
+            return entry.response
+
+        self._misses += 1
+        result = await self._provider.answer_question(video_context, question)
+        store.add(digest, scope, vector, result)
+        return result
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """返回语义缓存统计信息."""
+        return {
+            "size": len(self._store),
+            "hits": self._hits,
+            "misses": self._misses,
+        }
+
+    async def warmup(self) -> None:
+        """预热被包装的提供商."""
+        await self._provider.warmup()
+
+    async def close(self) -> None:
+        """关闭被包装的提供商."""
+        await self._provider.close()
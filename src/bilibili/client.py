@@ -6,8 +6,11 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import random
 import re
+import sys
 from typing import Any
 
 import httpx
@@ -18,12 +21,19 @@ from tenacity import (
     wait_exponential,
 )
 
+try:
+    # 可选加速：C 实现的 JSON 解析器，对 CJK 为主的大体积字幕更快
+    import orjson as _json
+except ImportError:  # pragma: no cover - 未安装时回退到标准库
+    import json as _json
+
 from src.bilibili.models import (
     AtNotification,
     ReplyResult,
     SubtitleContent,
     VideoInfo,
 )
+from src.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +43,9 @@ _AT_FEED_URL = f"{_API_BASE}/x/msgfeed/at"
 _VIDEO_INFO_URL = f"{_API_BASE}/x/web-interface/view"
 _REPLY_ADD_URL = f"{_API_BASE}/x/v2/reply/add"
 _PLAYER_WBI_URL = f"{_API_BASE}/x/player/wbi/v2"
+_PAGELIST_URL = f"{_API_BASE}/x/player/pagelist"
 _RELATION_URL = f"{_API_BASE}/x/space/acc/relation"  # 查询双向关系
+_NAV_URL = f"{_API_BASE}/x/web-interface/nav"  # 启动预热用
 
 _HEADERS = {
     "User-Agent": (
@@ -45,11 +57,166 @@ _HEADERS = {
     "Origin": "https://www.bilibili.com",
 }
 
+# 发送回复遇到限流（412 风控 / 429）时的重试次数和最长等待时间
+_RATE_LIMIT_STATUS = (412, 429)
+_RATE_LIMIT_RETRIES = 2
+_MAX_RETRY_AFTER = 60.0
+
+# 字幕 CDN 下载专用请求头
+_SUBTITLE_HEADERS = {"Accept-Encoding": "br, gzip"}
+
+# BV 号：BV + 10 位字母数字（显式字符集，避免 Unicode \w 匹配开销）
+_BVID_RE: re.Pattern[str] = re.compile(r"BV[0-9A-Za-z]{10}")
+
+# 连接池：预留足够的 keep-alive 连接，轮询和回复复用同一批 TLS 连接
+_HTTP_LIMITS = httpx.Limits(
+    max_keepalive_connections=32,
+    max_connections=64,
+    keepalive_expiry=60.0,
+)
+
 
 class BilibiliClientError(Exception):
     """B站 API 调用异常."""
 
 
+def _read_json(resp: httpx.Response) -> dict[str, Any]:
+    """校验 HTTP 状态并解析 JSON 响应体.
+
+    成功路径只做一次状态码比较；仅在 4xx/5xx 时才走
+    raise_for_status 构造 HTTPStatusError。
+    """
+    if resp.status_code >= 400:
+        resp.raise_for_status()
+    return _json.loads(resp.content)
+
+
+def _retry_after_seconds(resp: httpx.Response) -> float | None:
+    """解析 Retry-After 响应头（仅支持秒数格式）."""
+    value = resp.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return min(max(float(value), 0.0), _MAX_RETRY_AFTER)
+    except ValueError:
+        return None
+
+
+# 整条都是语气词（可带标点）的字幕条目，如 "嗯嗯"、"啊？"
+_FILLER_CUE_RE = re.compile(r"^[嗯啊呃额哦噢唔哎诶欸]+[，,。.！!？?～~…]*$")
+# 条目内连续重复的语气词，如 "嗯嗯嗯好的" → "嗯好的"
+_REPEATED_FILLER_RE = re.compile(r"([嗯啊呃额哦噢唔哎诶欸])\1+")
+# 相邻条目判定为近似重复的 Jaccard 阈值及 shingle 长度
+_DUPLICATE_JACCARD = 0.9
+_SHINGLE_SIZE = 5
+
+
+def _shingles(text: str) -> set[str]:
+    """字符级 n-gram 集合（短于 n 的文本整体作为一个 shingle）."""
+    if len(text) <= _SHINGLE_SIZE:
+        return {text}
+    return {
+        text[i : i + _SHINGLE_SIZE]
+        for i in range(len(text) - _SHINGLE_SIZE + 1)
+    }
+
+
+def _parse_subtitle(
+    raw: bytes, language: str, max_chars: int | None = None
+) -> SubtitleContent | None:
+    """解析字幕 JSON 并合并为纯文本和带时间戳的文本（同步，在线程中执行）.
+
+    合并前去掉纯语气词条目（如 "嗯嗯"、"啊？"）、折叠条目内连续重复的语气词，
+    并丢弃与上一条近似重复的条目，减少发送给 AI 的 prompt tokens。
+
+    指定 max_chars 时在拼接过程中截断：纯文本按字符数截断，带时间戳的
+    文本按整行截断（避免破坏时间戳格式），两者都达到上限即停止遍历。
+    """
+    data = _json.loads(raw)
+    body_items = data.get("body", [])
+    if not body_items:
+        return None
+
+    limit = max_chars if max_chars is not None else sys.maxsize
+
+    # 单次遍历同时生成纯文本和带时间戳的字幕（每30秒一个段落）
+    # 纯文本按 UTF-8 追加到 bytearray，避免构造中间列表，最后只解码一次
+    body_buf = bytearray()
+    body_len = 0  # 纯文本已追加的字符数（含分隔空格，末尾空格最后去掉）
+    timed_lines = []
+    timed_len = 0  # 带时间戳文本已追加的字符数（含换行符）
+    timed_full = False
+    current_time = -30
+    current_texts = []
+    prev_shingles: set[str] | None = None
+
+    def add_timed_line() -> None:
+        nonlocal timed_len, timed_full
+        time_str = _format_timestamp(current_time if current_time >= 0 else 0)
+        line = f"[{time_str}] {' '.join(current_texts)}"
+        if timed_len + len(line) + 1 > limit:
+            timed_full = True
+            return
+        timed_lines.append(line)
+        timed_len += len(line) + 1
+
+    for item in body_items:
+        # 按字幕条目的真实边界去冗余：丢弃纯语气词条目和与上一条近似重复的条目
+        content = _REPEATED_FILLER_RE.sub(r"\1", item.get("content", "").strip())
+        if not content or _FILLER_CUE_RE.match(content):
+            continue
+        shingles = _shingles(content)
+        if prev_shingles is not None and (
+            len(shingles & prev_shingles) / len(shingles | prev_shingles)
+            > _DUPLICATE_JACCARD
+        ):
+            continue
+        prev_shingles = shingles
+
+        start_sec = int(item.get("from", 0))
+        if body_len <= limit:
+            body_buf += content.encode("utf-8")
+            body_buf += b" "
+            body_len += len(content) + 1
+
+        # 每30秒创建一个新段落
+        if start_sec >= current_time + 30:
+            if current_texts:
+                add_timed_line()
+            current_time = (start_sec // 30) * 30
+            current_texts = []
+
+        if timed_full:
+            if body_len > limit:
+                break
+            continue
+        current_texts.append(content)
+
+    # 添加最后一段
+    if current_texts and not timed_full:
+        add_timed_line()
+
+    body_text = body_buf[:-1].decode("utf-8")
+    if max_chars is not None:
+        body_text = body_text[:max_chars]
+    body_with_time = "\n".join(timed_lines)
+
+    return SubtitleContent(
+        language=language,
+        body=body_text,
+        body_with_time=body_with_time,
+    )
+
+
+def _format_timestamp(seconds: int) -> str:
+    """将秒数格式化为 B站 时间戳格式（如 01:23 或 1:23:45）."""
+    hours, rem = divmod(seconds, 3600)
+    minutes, secs = divmod(rem, 60)
+    if hours > 0:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
 class BilibiliClient:
     """B站 API 适配器 — 将 HTTP API 转化为领域方法.
 
@@ -59,7 +226,15 @@ class BilibiliClient:
     - 异常处理与重试
     """
 
-    def __init__(self, sessdata: str, bili_jct: str, uid: int) -> None:
+    def __init__(
+        self,
+        sessdata: str,
+        bili_jct: str,
+        uid: int,
+        *,
+        subtitle_cache_ttl: int = 3600,
+        subtitle_cache_max_size: int = 256,
+    ) -> None:
         self._bili_jct = bili_jct
         self._uid = uid
         self._cookies = {
@@ -70,22 +245,39 @@ class BilibiliClient:
             headers=_HEADERS,
             cookies=self._cookies,
             timeout=httpx.Timeout(15.0),
-            follow_redirects=True,
+            limits=_HTTP_LIMITS,
+            http2=True,
+            # B站 API 均直接返回 JSON，不需要跟随重定向（字幕下载单独开启）
+            follow_redirects=False,
         )
+        # 字幕缓存（LRU + TTL）: (字幕地址, 截断长度) -> 字幕内容
+        # 同一视频短时间内常被多次 @，省去重复的下载和解析
+        self._subtitle_cache: TTLCache[
+            tuple[str, int | None], SubtitleContent
+        ] = TTLCache(subtitle_cache_ttl, subtitle_cache_max_size, lru=True)
 
     async def close(self) -> None:
         await self._client.aclose()
 
+    async def warmup(self) -> None:
+        """预热连接池：提前完成 DNS 解析和 TLS 握手，失败不影响启动."""
+        try:
+            await self._client.get(_NAV_URL)
+            logger.debug("B站连接预热完成")
+        except Exception:
+            logger.warning("B站连接预热失败", exc_info=True)
+
     # ── 用户关系检查 ──────────────────────────────────────────
 
-    async def is_user_following_me(self, user_uid: int) -> bool:
+    async def is_user_following_me(self, user_uid: int) -> bool | None:
         """检查指定用户是否关注了当前账号.
 
         Args:
             user_uid: 要检查的用户 UID。
 
         Returns:
-            True 表示用户已关注，False 表示未关注。
+            True 表示用户已关注，False 表示未关注，
+            None 表示查询失败（API 错误、风控或网络异常），由调用方决定如何处理。
         """
         try:
             # 使用 /x/space/acc/relation 接口查询双向关系
@@ -93,8 +285,7 @@ class BilibiliClient:
                 _RELATION_URL,
                 params={"mid": user_uid},  # mid 是要查询的用户
             )
-            resp.raise_for_status()
-            data = resp.json()
+            data = _read_json(resp)
 
             if data.get("code") != 0:
                 logger.warning(
@@ -102,8 +293,7 @@ class BilibiliClient:
                     user_uid,
                     data.get("message"),
                 )
-                # API 错误时默认允许，避免误伤
-                return True
+                return None
 
             # be_relation.attribute 表示对方对我的关系
             # 0=无关系, 2=已关注我, 6=互相关注, 128=已拉黑我
@@ -122,8 +312,7 @@ class BilibiliClient:
 
         except Exception:
             logger.warning("检查用户关系异常: uid=%d", user_uid, exc_info=True)
-            # 出错时默认允许，避免误伤
-            return True
+            return None
 
     # ── @提醒通知 ─────────────────────────────────────────────
 
@@ -149,8 +338,7 @@ class BilibiliClient:
         params: dict[str, Any] = {"build": 0, "mobi_app": "web"}
 
         resp = await self._client.get(_AT_FEED_URL, params=params)
-        resp.raise_for_status()
-        data = resp.json()
+        data = _read_json(resp)
 
         if data.get("code") != 0:
             raise BilibiliClientError(
@@ -211,8 +399,8 @@ class BilibiliClient:
     @staticmethod
     def _extract_bvid(uri: str) -> str | None:
         """从 URL 中提取 BV 号."""
-        match = re.search(r"(BV[\w]{10})", uri)
-        return match.group(1) if match else None
+        match = _BVID_RE.search(uri)
+        return match.group(0) if match else None
 
     # ── 视频信息 ──────────────────────────────────────────────
 
@@ -233,8 +421,7 @@ class BilibiliClient:
         resp = await self._client.get(
             _VIDEO_INFO_URL, params={"bvid": bvid}
         )
-        resp.raise_for_status()
-        data = resp.json()
+        data = _read_json(resp)
 
         if data.get("code") != 0:
             raise BilibiliClientError(
@@ -255,6 +442,30 @@ class BilibiliClient:
             cid=cid,
         )
 
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(min=2, max=10),
+        retry=retry_if_exception_type(httpx.TransportError),
+    )
+    async def fetch_cid(self, bvid: str) -> int:
+        """获取视频第一个分P的 cid（比 fetch_video_info 更轻量）.
+
+        Args:
+            bvid: 视频 BV 号。
+
+        Returns:
+            第一个分P的 cid。
+        """
+        resp = await self._client.get(_PAGELIST_URL, params={"bvid": bvid})
+        data = _read_json(resp)
+
+        pages = data.get("data") or []
+        if data.get("code") != 0 or not pages:
+            raise BilibiliClientError(
+                f"获取视频分P失败 ({bvid}): {data.get('message')}"
+            )
+        return pages[0]["cid"]
+
     # ── 字幕获取 ──────────────────────────────────────────────
 
     @retry(
@@ -263,13 +474,14 @@ class BilibiliClient:
         retry=retry_if_exception_type(httpx.TransportError),
     )
     async def fetch_subtitle(
-        self, bvid: str, cid: int
+        self, bvid: str, cid: int, *, max_chars: int | None = None
     ) -> SubtitleContent | None:
         """获取视频字幕（AI 生成的 CC 字幕优先）.
 
         Args:
-            bvid: 视频 BV 号。
-            cid:  分P 的 cid。
+            bvid:      视频 BV 号。
+            cid:       分P 的 cid。
+            max_chars: 字幕文本最大字符数，在解析拼接时截断，None 表示不截断。
 
         Returns:
             SubtitleContent 或 None（无字幕时）。
@@ -277,8 +489,7 @@ class BilibiliClient:
         # 通过 player/wbi/v2 接口获取字幕列表
         params = {"bvid": bvid, "cid": cid}
         resp = await self._client.get(_PLAYER_WBI_URL, params=params)
-        resp.raise_for_status()
-        data = resp.json()
+        data = _read_json(resp)
 
         subtitle_info = (
             data.get("data", {}).get("subtitle", {}).get("subtitles", [])
@@ -304,72 +515,43 @@ class BilibiliClient:
         if subtitle_url.startswith("//"):
             subtitle_url = "https:" + subtitle_url
 
-        return await self._download_subtitle(
-            subtitle_url, chosen.get("lan", "unknown")
+        # 字幕地址的查询参数是签名（每次请求都会变化），路径才标识字幕内容；
+        # 缓存的是截断后的结果，因此截断长度也是键的一部分
+        cache_key = (subtitle_url.split("?", 1)[0], max_chars)
+        cached = self._subtitle_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("字幕缓存命中: %s", bvid)
+            return cached
+
+        subtitle = await self._download_subtitle(
+            subtitle_url, chosen.get("lan", "unknown"), max_chars
         )
+        if subtitle is not None:
+            self._subtitle_cache.put(cache_key, subtitle)
+        return subtitle
 
     async def _download_subtitle(
-        self, url: str, language: str
+        self, url: str, language: str, max_chars: int | None
     ) -> SubtitleContent | None:
-        """下载并解析字幕 JSON."""
+        """下载并解析字幕 JSON.
+
+        解析和合并是 CPU 密集操作（长视频字幕可达数 MB），放到线程中执行，
+        避免阻塞事件循环上其他 @通知的处理。
+        """
         try:
-            resp = await self._client.get(url)
-            resp.raise_for_status()
-            data = resp.json()
+            # 字幕 JSON 重复度高，优先协商 brotli（比 gzip 更小）
+            resp = await self._client.get(
+                url, headers=_SUBTITLE_HEADERS, follow_redirects=True
+            )
+            if resp.status_code >= 400:
+                resp.raise_for_status()
+            return await asyncio.to_thread(
+                _parse_subtitle, resp.content, language, max_chars
+            )
         except Exception:
             logger.warning("下载字幕失败: %s", url, exc_info=True)
             return None
 
-        body_items = data.get("body", [])
-        if not body_items:
-            return None
-
-        # 合并所有字幕行为纯文本
-        lines = [item.get("content", "") for item in body_items]
-        body_text = " ".join(lines)
-
-        # 生成带时间戳的字幕（每30秒一个段落）
-        timed_lines = []
-        current_time = -30
-        current_texts = []
-        
-        for item in body_items:
-            start_sec = int(item.get("from", 0))
-            content = item.get("content", "")
-            
-            # 每30秒创建一个新段落
-            if start_sec >= current_time + 30:
-                if current_texts:
-                    time_str = self._format_timestamp(current_time if current_time >= 0 else 0)
-                    timed_lines.append(f"[{time_str}] {' '.join(current_texts)}")
-                current_time = (start_sec // 30) * 30
-                current_texts = []
-            
-            current_texts.append(content)
-        
-        # 添加最后一段
-        if current_texts:
-            time_str = self._format_timestamp(current_time if current_time >= 0 else 0)
-            timed_lines.append(f"[{time_str}] {' '.join(current_texts)}")
-        
-        body_with_time = "\n".join(timed_lines)
-
-        return SubtitleContent(
-            language=language,
-            body=body_text,
-            body_with_time=body_with_time,
-        )
-
-    @staticmethod
-    def _format_timestamp(seconds: int) -> str:
-        """将秒数格式化为 B站 时间戳格式（如 01:23 或 1:23:45）."""
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
-        secs = seconds % 60
-        if hours > 0:
-            return f"{hours}:{minutes:02d}:{secs:02d}"
-        return f"{minutes:02d}:{secs:02d}"
-
     # ── 发送回复 ──────────────────────────────────────────────
 
     @retry(
@@ -404,9 +586,8 @@ class BilibiliClient:
             "csrf": self._bili_jct,
         }
 
-        resp = await self._client.post(_REPLY_ADD_URL, data=form_data)
-        resp.raise_for_status()
-        data = resp.json()
+        resp = await self._post_with_backoff(_REPLY_ADD_URL, form_data)
+        data = _read_json(resp)
 
         if data.get("code") != 0:
             msg = data.get("message", "unknown error")
@@ -416,3 +597,31 @@ class BilibiliClient:
         rpid = data.get("data", {}).get("rpid", 0)
         logger.info("回复成功, rpid=%d", rpid)
         return ReplyResult(success=True, rpid=rpid)
+
+    async def _post_with_backoff(
+        self, url: str, form_data: dict[str, str]
+    ) -> httpx.Response:
+        """发送 POST 请求，被限流时按 Retry-After（缺省指数退避）等待后重试.
+
+        412/429 表示请求未被处理，重试不会产生重复回复。
+        """
+        attempt = 0
+        while True:
+            resp = await self._client.post(url, data=form_data)
+            if (
+                resp.status_code not in _RATE_LIMIT_STATUS
+                or attempt >= _RATE_LIMIT_RETRIES
+            ):
+                return resp
+
+            delay = _retry_after_seconds(resp)
+            if delay is None:
+                delay = 3.0 * 2**attempt
+            delay += random.uniform(0, 0.5)
+            logger.warning(
+                "发送请求被限流 (HTTP %d)，%.1f 秒后重试",
+                resp.status_code,
+                delay,
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -1,12 +1,15 @@
-"""数据模型 — B站 API 相关的领域实体."""
+"""数据模型 — B站 API 相关的领域实体.
+
+使用 msgspec.Struct：C 层实现的构造与属性访问，
+比 dataclass 的 Python 层 __init__ 更快，每条 @通知都会构造这些对象。
+"""
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import msgspec
 
 
-@dataclass(frozen=True, slots=True)
-class AtNotification:
+class AtNotification(msgspec.Struct, frozen=True):
     """一条 @提醒通知."""
 
     at_id: int  # 通知 ID，用于去重
@@ -20,8 +23,7 @@ class AtNotification:
     timestamp: int  # 时间戳
 
 
-@dataclass(frozen=True, slots=True)
-class VideoInfo:
+class VideoInfo(msgspec.Struct, frozen=True):
     """视频基本信息."""
 
     bvid: str
@@ -33,8 +35,7 @@ class VideoInfo:
     cid: int  # 第一个分P的 cid，用于获取字幕
 
 
-@dataclass(slots=True)
-class SubtitleContent:
+class SubtitleContent(msgspec.Struct):
     """视频字幕内容."""
 
     language: str
@@ -42,8 +43,7 @@ class SubtitleContent:
     body_with_time: str = ""  # 带时间戳的字幕（用于AI生成时间线）
 
 
-@dataclass(slots=True)
-class VideoContext:
+class VideoContext(msgspec.Struct):
     """发送给 AI 的完整视频上下文."""
 
     bvid: str
@@ -53,7 +53,6 @@ class VideoContext:
     duration_text: str
     subtitle: str | None = None  # 字幕文本，可能为空
     subtitle_with_time: str | None = None  # 带时间戳的字幕
-    user_question: str = ""  # 用户额外问题
 
     def to_prompt(self, with_timeline: bool = True) -> str:
         """将视频上下文格式化为 AI prompt.
@@ -77,14 +76,10 @@ class VideoContext:
         else:
             parts.append("（该视频没有字幕内容）")
 
-        if self.user_question:
-            parts.append(f"\n用户的问题/要求：{self.user_question}")
-
         return "\n".join(parts)
 
 
-@dataclass(slots=True)
-class ReplyResult:
+class ReplyResult(msgspec.Struct):
     """回复结果."""
 
     success: bool
@@ -13,18 +13,49 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
 import time
-from collections import OrderedDict
+from collections.abc import AsyncIterator
+
+from src.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# 粗粒度时钟（参考 memcached 的 current_time）：TTL 以秒计，
+# 由后台任务每秒刷新一次，缓存读写时无需每次读取系统时钟。
+# 未启动时钟任务时为 None，回退到实时读取。
+_coarse_now_ns: int | None = None
+
+
+async def run_coarse_clock(interval: float = 1.0) -> None:
+    """刷新粗粒度时钟（阻塞运行，任务被取消时停止并恢复实时读取）."""
+    global _coarse_now_ns
+    try:
+        while True:
+            _coarse_now_ns = time.monotonic_ns()
+            await asyncio.sleep(interval)
+    finally:
+        _coarse_now_ns = None
+
+
+def _now_ns() -> int:
+    """当前单调时间（纳秒），优先使用粗粒度时钟."""
+    now = _coarse_now_ns
+    return now if now is not None else time.monotonic_ns()
+
 
 class SummaryCache:
     """视频总结缓存（LRU + TTL）.
 
-    使用 OrderedDict 实现 LRU 淘汰，
-    每个条目带有过期时间戳。
+    底层为 LRU 模式的 TTLCache：命中时移到末尾，满时淘汰最久未使用的条目；
+    过期判断使用粗粒度时钟。
+
+    并发说明：get / put 是同步方法，中间没有 await 点，在事件循环中
+    天然原子，无需加锁。真正的竞争在于同一视频的多个总结请求同时
+    未命中、各自调用 AI，调用方应通过 ``lock(bvid)`` 串行化
+    "查缓存 → 生成 → 写缓存" 的过程。
     """
 
     def __init__(
@@ -36,11 +67,16 @@ class SummaryCache:
             ttl:      缓存过期时间（秒），默认 24 小时。
             max_size: 最大缓存条数。
         """
-        self._ttl = ttl
         self._max_size = max_size
-        self._cache: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._cache: TTLCache[str, str] = TTLCache(
+            ttl, max_size, lru=True, clock=_now_ns
+        )
         self._hits = 0
         self._misses = 0
+        # 按 bvid 的生成锁及等待者计数，最后一个持有者退出时删除
+        self._locks: dict[str, tuple[asyncio.Lock, list[int]]] = {}
+        # 日志级别在启动时确定，缓存判断结果，避免热路径上每次都走 logger 分发
+        self._debug = logger.isEnabledFor(logging.DEBUG)
 
     def get(self, bvid: str) -> str | None:
         """查询缓存.
@@ -49,25 +85,16 @@ class SummaryCache:
             bvid: 视频 BV 号。
 
         Returns:
-            缓存的总结文本，未命中返回 None。
+            缓存的总结文本，未命中或已过期返回 None。
         """
-        entry = self._cache.get(bvid)
-        if entry is None:
+        content = self._cache.get(bvid)
+        if content is None:
             self._misses += 1
             return None
 
-        content, expire_at = entry
-        if time.monotonic() > expire_at:
-            # 已过期，移除
-            del self._cache[bvid]
-            self._misses += 1
-            logger.debug("缓存过期: %s", bvid)
-            return None
-
-        # 命中，移到末尾（最近使用）
-        self._cache.move_to_end(bvid)
         self._hits += 1
-        logger.debug("缓存命中: %s (hits=%d)", bvid, self._hits)
+        if self._debug:
+            logger.debug("缓存命中: %s (hits=%d)", bvid, self._hits)
         return content
 
     def put(self, bvid: str, content: str) -> None:
@@ -77,15 +104,28 @@ class SummaryCache:
             bvid:    视频 BV 号。
             content: 总结文本。
         """
-        # 淘汰超出容量的旧条目
-        while len(self._cache) >= self._max_size:
-            evicted_key, _ = self._cache.popitem(last=False)
-            logger.debug("缓存淘汰: %s", evicted_key)
-
-        expire_at = time.monotonic() + self._ttl
-        self._cache[bvid] = (content, expire_at)
-        self._cache.move_to_end(bvid)
-        logger.debug("缓存写入: %s", bvid)
+        self._cache.put(bvid, content)
+        if self._debug:
+            logger.debug("缓存写入: %s", bvid)
+
+    @contextlib.asynccontextmanager
+    async def lock(self, bvid: str) -> AsyncIterator[None]:
+        """按 bvid 加锁，同一视频同一时刻只有一个协程在生成总结.
+
+        后到者等待锁释放后再查缓存即可直接命中，避免重复调用 AI。
+        """
+        entry = self._locks.get(bvid)
+        if entry is None:
+            entry = self._locks[bvid] = (asyncio.Lock(), [0])
+        lock, users = entry
+        users[0] += 1
+        try:
+            async with lock:
+                yield
+        finally:
+            users[0] -= 1
+            if not users[0]:
+                del self._locks[bvid]
 
     @property
     def stats(self) -> dict[str, int]:
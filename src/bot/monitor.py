@@ -8,8 +8,10 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 
 from src.bilibili.client import BilibiliClient
+from src.bilibili.models import AtNotification
 from src.bot.processor import MessageProcessor
 
 logger = logging.getLogger(__name__)
@@ -34,16 +36,22 @@ class AtMonitor:
         processor: MessageProcessor,
         *,
         poll_interval: int = 30,
+        max_concurrency: int = 3,
     ) -> None:
         self._bili = bili_client
         self._processor = processor
         self._poll_interval = poll_interval
+        # 同时处理的通知数上限：每条通知会发起多个 B站 请求和一次 AI 流式调用，
+        # 一整页通知同时放开会形成请求突发，容易触发 B站 风控（412）
+        self._semaphore = asyncio.Semaphore(max_concurrency)
         self._last_at_time: int = 0
         # 使用 dict 保留插入顺序（Python 3.7+），值为时间戳
         self._processed_ids: dict[int, int] = {}
         self._running = False
-        # 限制已处理 ID 集合的大小，防止内存泄漏
+        # 限制已处理 ID 集合的大小，防止内存泄漏（写入时淘汰最早的 ID）
         self._max_processed_ids = 10000
+        # 日志级别在启动时确定，缓存判断结果，避免每轮都走 logger 分发
+        self._debug = logger.isEnabledFor(logging.DEBUG)
 
     async def run(self) -> None:
         """启动轮询循环（阻塞）."""
@@ -61,7 +69,8 @@ class AtMonitor:
             except Exception:
                 logger.error("轮询异常", exc_info=True)
 
-            logger.debug("💤 等待 %d 秒后进行下次轮询...", self._poll_interval)
+            if self._debug:
+                logger.debug("💤 等待 %d 秒后进行下次轮询...", self._poll_interval)
             await asyncio.sleep(self._poll_interval)
 
     async def stop(self) -> None:
@@ -77,7 +86,7 @@ class AtMonitor:
                 # 记录最大时间戳
                 self._last_at_time = max(n.timestamp for n in notifications)
                 for n in notifications:
-                    self._processed_ids[n.at_id] = n.timestamp
+                    self._mark_processed(n.at_id, n.timestamp)
                 logger.info(
                     "初始化完成，跳过 %d 条历史通知, last_at_time=%d",
                     len(notifications),
@@ -85,12 +94,10 @@ class AtMonitor:
                 )
             else:
                 # 无历史通知，使用当前时间戳（避免处理之后的旧通知）
-                import time
                 self._last_at_time = int(time.time())
                 logger.info("初始化完成，无历史通知，last_at_time=%d", self._last_at_time)
         except Exception:
             # 初始化失败，使用当前时间戳，避免后续处理大量历史消息
-            import time
             self._last_at_time = int(time.time())
             logger.warning(
                 "初始化拉取失败，设置 last_at_time=%d，将在下次轮询重试",
@@ -109,10 +116,12 @@ class AtMonitor:
 
         # 过滤：只处理时间戳 >= 上次记录的通知，且未处理过的
         # 使用 >= 因为同一秒可能有多条通知
+        # 先取到局部变量，推导式中不再逐条做实例属性查找
+        ts_cutoff = self._last_at_time
+        processed = self._processed_ids
         new_notifications = [
             n for n in notifications
-            if n.timestamp >= self._last_at_time
-            and n.at_id not in self._processed_ids
+            if n.timestamp >= ts_cutoff and n.at_id not in processed
         ]
 
         if not new_notifications:
@@ -121,48 +130,51 @@ class AtMonitor:
 
         logger.info("📬 发现 %d 条新 @通知", len(new_notifications))
 
-        # 按时间正序处理（先旧后新）
+        # 有限并发处理（最多 max_concurrency 条同时进行），视频/字幕/AI 阶段相互重叠；
+        # 回复节奏由 MessageProcessor 控制
+        # 按时间正序提交（先旧后新），回复锁按到达顺序放行
+        await asyncio.gather(
+            *(self._handle(notif) for notif in reversed(new_notifications))
+        )
+
+        # 无论成功失败，都标记为已处理（避免重复尝试）
+        # 同时在这一遍中取所有新通知的最大时间戳，更新 last_at_time
+        max_new_ts = self._last_at_time
         for notif in reversed(new_notifications):
-            try:
+            self._mark_processed(notif.at_id, notif.timestamp)
+            if notif.timestamp > max_new_ts:
+                max_new_ts = notif.timestamp
+        self._last_at_time = max_new_ts
+
+    async def _handle(self, notif: AtNotification) -> None:
+        """处理单条通知并记录结果，异常不向外传播."""
+        try:
+            async with self._semaphore:
                 success = await self._processor.process(notif)
-                if success:
-                    logger.info(
-                        "✅ 处理成功: sender=%s bvid=%s",
-                        notif.sender_name,
-                        notif.bvid,
-                    )
-                else:
-                    logger.warning(
-                        "⚠️ 处理失败: sender=%s bvid=%s",
-                        notif.sender_name,
-                        notif.bvid,
-                    )
-            except Exception:
-                logger.error(
-                    "❌ 处理异常: sender=%s bvid=%s",
+            if success:
+                logger.info(
+                    "✅ 处理成功: sender=%s bvid=%s",
                     notif.sender_name,
                     notif.bvid,
-                    exc_info=True,
                 )
-
-            # 无论成功失败，都标记为已处理（避免重复尝试）
-            self._processed_ids[notif.at_id] = notif.timestamp
-
-            # 回复间隔，避免触发 B站 风控
-            await asyncio.sleep(3)
-
-        # 更新最新时间戳（取所有新通知中的最大时间戳）
-        if new_notifications:
-            max_new_ts = max(n.timestamp for n in new_notifications)
-            self._last_at_time = max(self._last_at_time, max_new_ts)
-
-        # 清理过大的已处理 ID 集合（按插入顺序移除最早的）
-        if len(self._processed_ids) > self._max_processed_ids:
-            excess = len(self._processed_ids) - self._max_processed_ids // 2
-            # dict 保持插入顺序，移除最早插入的
-            keys_to_remove = list(self._processed_ids.keys())[:excess]
-            for rid in keys_to_remove:
-                del self._processed_ids[rid]
-            logger.debug(
-                "清理已处理 ID 集合, 移除 %d 条", excess
+            else:
+                logger.warning(
+                    "⚠️ 处理失败: sender=%s bvid=%s",
+                    notif.sender_name,
+                    notif.bvid,
+                )
+        except Exception:
+            logger.error(
+                "❌ 处理异常: sender=%s bvid=%s",
+                notif.sender_name,
+                notif.bvid,
+                exc_info=True,
             )
+
+    def _mark_processed(self, at_id: int, timestamp: int) -> None:
+        """记录已处理的通知 ID，超出上限时淘汰最早插入的一条（均摊 O(1)）."""
+        processed = self._processed_ids
+        if at_id not in processed and len(processed) >= self._max_processed_ids:
+            # dict 保持插入顺序，头部即最早插入的
+            del processed[next(iter(processed))]
+        processed[at_id] = timestamp
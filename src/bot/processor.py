@@ -6,21 +6,27 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
 import re
+import time
 
 from src.ai.base import AIProvider
 from src.bilibili.client import BilibiliClient
-from src.bilibili.models import AtNotification, VideoContext
+from src.bilibili.models import AtNotification, SubtitleContent, VideoContext
 from src.bot.cache import SummaryCache
+from src.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
-# 匹配 @用户名 部分，用于从评论内容中提取用户实际问题
-_AT_PATTERN = re.compile(r"@[\w\-]+\s*")
+# 匹配 @用户名 及其前后空白，用于从评论内容中提取用户实际问题
+_AT_PATTERN = re.compile(r"\s*@[\w\-]+\s*")
 
 # 识别总结意图的关键词
-_SUMMARY_KEYWORDS = {"总结", "概括", "摘要", "说了什么", "讲了什么", "内容是什么", "说了啥", "讲了啥"}
+_SUMMARY_KEYWORDS = ("总结", "概括", "摘要", "说了什么", "讲了什么", "内容是什么", "说了啥", "讲了啥")
+# 预编译为单个正则，一次 C 层扫描完成全部关键词匹配
+_SUMMARY_RE = re.compile("|".join(map(re.escape, _SUMMARY_KEYWORDS)))
 
 # 字幕内容不足时的提示消息
 _NO_SUBTITLE_MSG = """😅 这个视频没有字幕内容（可能是纯画面/音乐/特效类视频），没办法生成总结哦~
@@ -38,14 +44,27 @@ _NOT_FOLLOWING_MSG = """👋 你好呀～
 
 点击我的头像 → 关注 → 再来 @我 试试吧！"""
 
+# 关注状态缓存：已关注的结果较稳定，缓存 1 小时；未关注的只缓存 5 分钟，
+# 用户关注后很快就能正常使用
+_FOLLOWER_TTL = 3600
+_FOLLOWER_NEGATIVE_TTL = 300
+_FOLLOWER_CACHE_MAX_SIZE = 1000
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_duration(seconds: int) -> str:
+    """将视频时长（秒）格式化为 "X分Y秒"（结果只取决于秒数，可缓存）."""
+    minutes, secs = divmod(seconds, 60)
+    return f"{minutes}分{secs}秒"
+
 
 class MessageProcessor:
     """处理单条 @通知的完整流程.
 
     编排流程：
-    1. 获取视频信息
-    2. 获取字幕
-    3. 检查缓存 / 调用 AI 生成总结
+    1. 检查缓存
+    2. 并发获取视频信息和字幕
+    3. 调用 AI 生成总结 / 回答
     4. 发送回复
     """
 
@@ -58,6 +77,7 @@ class MessageProcessor:
         max_subtitle_chars: int = 8000,
         reply_prefix: str = "【AI总结】",
         max_reply_chars: int = 900,
+        reply_interval: float = 3.0,
     ) -> None:
         self._bili = bili_client
         self._ai = ai_provider
@@ -65,6 +85,15 @@ class MessageProcessor:
         self._max_subtitle_chars = max_subtitle_chars
         self._reply_prefix = reply_prefix
         self._max_reply_chars = max_reply_chars
+        # 回复节流：串行发送且相邻回复至少间隔 reply_interval 秒，避免触发 B站 风控
+        # 只限制发送这一步，获取视频信息、调用 AI 等阶段可以并发进行
+        self._reply_interval = reply_interval
+        self._reply_lock = asyncio.Lock()
+        self._last_reply_at = float("-inf")
+        # 关注状态缓存: uid -> 是否关注（FIFO + TTL）
+        self._follower_cache: TTLCache[int, bool] = TTLCache(
+            _FOLLOWER_TTL, _FOLLOWER_CACHE_MAX_SIZE
+        )
 
     async def process(self, notification: AtNotification) -> bool:
         """处理一条 @通知.
@@ -85,9 +114,7 @@ class MessageProcessor:
 
         try:
             # 0. 检查用户是否关注了我
-            is_following = await self._bili.is_user_following_me(
-                notification.sender_uid
-            )
+            is_following = await self._is_following(notification.sender_uid)
             if not is_following:
                 logger.info(
                     "用户未关注，发送提示: sender=%s uid=%d",
@@ -96,76 +123,18 @@ class MessageProcessor:
                 )
                 return await self._send_reply(notification, _NOT_FOLLOWING_MSG)
 
-            # 1. 获取视频信息
-            video = await self._bili.fetch_video_info(bvid)
-
-            # 2. 解析用户意图
+            # 1. 解析用户意图
             user_text = self._extract_user_question(notification.content)
             is_summary = self._is_summary_request(user_text)
 
-            # 3. 尝试缓存（仅总结请求可缓存）
-            if is_summary:
-                cached = self._cache.get(bvid)
-                if cached:
-                    logger.info("使用缓存总结: %s", bvid)
-                    reply_text = self._format_reply(cached)
-                    return await self._send_reply(notification, reply_text)
-
-            # 4. 获取字幕
-            subtitle_text = None
-            subtitle_with_time = None
-            subtitle = await self._bili.fetch_subtitle(bvid, video.cid)
-            if subtitle:
-                subtitle_text = subtitle.body[: self._max_subtitle_chars]
-                # 带时间戳的字幕按行截断，避免破坏时间戳格式
-                if subtitle.body_with_time:
-                    lines = subtitle.body_with_time.split("\n")
-                    truncated_lines = []
-                    total_len = 0
-                    for line in lines:
-                        if total_len + len(line) + 1 > self._max_subtitle_chars:
-                            break
-                        truncated_lines.append(line)
-                        total_len += len(line) + 1
-                    subtitle_with_time = "\n".join(truncated_lines) if truncated_lines else None
-
-            # 5. 检查字幕质量 — 无字幕或极少内容时直接回复，节省 AI 调用
-            if not subtitle_text or len(subtitle_text.strip()) < _MIN_SUBTITLE_CHARS:
-                logger.info(
-                    "字幕内容不足，跳过 AI 调用: bvid=%s subtitle_len=%d",
-                    bvid,
-                    len(subtitle_text) if subtitle_text else 0,
-                )
-                return await self._send_reply(notification, _NO_SUBTITLE_MSG)
-
-            # 6. 构建视频上下文
-            duration_min = video.duration // 60
-            duration_sec = video.duration % 60
-            context = VideoContext(
-                bvid=bvid,
-                title=video.title,
-                description=video.description[:500],
-                owner_name=video.owner_name,
-                duration_text=f"{duration_min}分{duration_sec}秒",
-                subtitle=subtitle_text,
-                subtitle_with_time=subtitle_with_time,
-                user_question=user_text if not is_summary else "",
-            )
-
-            # 7. 调用 AI
+            # 2. 总结请求按视频加锁：并发的同视频请求只生成一次，后到者直接命中缓存
             if is_summary:
-                ai_result = await self._ai.summarize_video(
-                    context.to_prompt()
-                )
-                # 写入缓存
-                self._cache.put(bvid, ai_result)
+                async with self._cache.lock(bvid):
+                    reply_text = await self._build_reply(bvid, user_text, True)
             else:
-                ai_result = await self._ai.answer_question(
-                    context.to_prompt(), user_text
-                )
+                reply_text = await self._build_reply(bvid, user_text, False)
 
-            # 8. 发送回复
-            reply_text = self._format_reply(ai_result)
+            # 3. 发送回复（在锁外进行，回复节流不阻塞同视频的其他请求）
             return await self._send_reply(notification, reply_text)
 
         except Exception:
@@ -174,10 +143,95 @@ class MessageProcessor:
             )
             return False
 
+    async def _build_reply(
+        self, bvid: str, user_text: str, is_summary: bool
+    ) -> str:
+        """查缓存 / 获取视频信息和字幕 / 调用 AI，返回待发送的回复文本."""
+        # 1. 尝试缓存（仅总结请求可缓存，命中时无需请求视频信息）
+        if is_summary:
+            cached = self._cache.get(bvid)
+            if cached:
+                logger.info("使用缓存总结: %s", bvid)
+                return self._format_reply(cached)
+
+        # 2. 并发获取视频信息和字幕（字幕只依赖 bvid → cid）
+        video, subtitle = await asyncio.gather(
+            self._bili.fetch_video_info(bvid),
+            self._fetch_subtitle(bvid),
+        )
+
+        # 3. 字幕已由客户端在解析时按 max_subtitle_chars 截断
+        subtitle_text = None
+        subtitle_with_time = None
+        if subtitle:
+            subtitle_text = subtitle.body
+            subtitle_with_time = subtitle.body_with_time or None
+
+        # 4. 检查字幕质量 — 无字幕或极少内容时直接回复，节省 AI 调用
+        if not subtitle_text or len(subtitle_text.strip()) < _MIN_SUBTITLE_CHARS:
+            logger.info(
+                "字幕内容不足，跳过 AI 调用: bvid=%s subtitle_len=%d",
+                bvid,
+                len(subtitle_text) if subtitle_text else 0,
+            )
+            return _NO_SUBTITLE_MSG
+
+        # 5. 构建视频上下文（问题由 answer_question 单独传入，不写入上下文，
+        #    保证总结和问答发送的上下文消息逐字节相同，共享 prompt 缓存）
+        context = VideoContext(
+            bvid=bvid,
+            title=video.title,
+            description=video.description[:500],
+            owner_name=video.owner_name,
+            duration_text=_format_duration(video.duration),
+            subtitle=subtitle_text,
+            subtitle_with_time=subtitle_with_time,
+        )
+
+        # 6. 调用 AI
+        if is_summary:
+            ai_result = await self._ai.summarize_video(
+                context.to_prompt()
+            )
+            # 写入缓存
+            self._cache.put(bvid, ai_result)
+        else:
+            ai_result = await self._ai.answer_question(
+                context.to_prompt(), user_text
+            )
+
+        return self._format_reply(ai_result)
+
+    async def _fetch_subtitle(self, bvid: str) -> SubtitleContent | None:
+        """通过轻量的分P接口获取 cid 后拉取字幕."""
+        cid = await self._bili.fetch_cid(bvid)
+        return await self._bili.fetch_subtitle(
+            bvid, cid, max_chars=self._max_subtitle_chars
+        )
+
+    async def _is_following(self, uid: int) -> bool:
+        """查询用户是否关注了我，结果按 uid 缓存（未关注的 TTL 更短，查询失败不缓存）."""
+        cached = self._follower_cache.get(uid)
+        if cached is not None:
+            return cached
+
+        is_following = await self._bili.is_user_following_me(uid)
+        if is_following is None:
+            # 查询失败时默认允许，避免误伤；不写入缓存，下次 @ 时重新检查
+            return True
+
+        self._follower_cache.put(
+            uid,
+            is_following,
+            ttl=_FOLLOWER_TTL if is_following else _FOLLOWER_NEGATIVE_TTL,
+        )
+        return is_following
+
     def _extract_user_question(self, content: str) -> str:
         """从评论内容中提取用户实际问题（去掉 @xxx 部分）."""
-        cleaned = _AT_PATTERN.sub("", content).strip()
-        return cleaned
+        # @ 及其两侧空白替换为单个空格，避免句中 @ 把前后词语粘连在一起；
+        # 句首 / 句尾的 @ 留下的空格由 strip 去掉
+        return _AT_PATTERN.sub(" ", content).strip()
 
     def _is_summary_request(self, text: str) -> bool:
         """判断是否为总结请求（而非具体问题）.
@@ -187,14 +241,23 @@ class MessageProcessor:
         """
         if not text:
             return True
-        return any(kw in text for kw in _SUMMARY_KEYWORDS)
+        return _SUMMARY_RE.search(text) is not None
 
     def _format_reply(self, ai_text: str) -> str:
-        """格式化回复文本，加前缀并截断."""
-        reply = f"{self._reply_prefix}\n{ai_text}"
-        if len(reply) > self._max_reply_chars:
-            reply = reply[: self._max_reply_chars - 3] + "..."
-        return reply
+        """格式化回复文本，加前缀并截断.
+
+        先截断 AI 文本再拼接前缀，避免构造完整长字符串后再切片。
+        前缀本身已放不下 "..." 时回退为对整条回复截断，保证不超过上限。
+        """
+        limit = self._max_reply_chars - len(self._reply_prefix) - 1  # 换行符
+        if limit < 3:
+            reply = f"{self._reply_prefix}\n{ai_text}"
+            if len(reply) > self._max_reply_chars:
+                reply = reply[: max(self._max_reply_chars - 3, 0)] + "..."
+            return reply
+        if len(ai_text) > limit:
+            ai_text = ai_text[: limit - 3] + "..."
+        return f"{self._reply_prefix}\n{ai_text}"
 
     async def _send_reply(
         self, notification: AtNotification, text: str
@@ -209,12 +272,19 @@ class MessageProcessor:
             root = notification.root_id
             parent = notification.source_id
 
-        result = await self._bili.send_reply(
-            oid=notification.oid,
-            root=root,
-            parent=parent,
-            message=text,
-        )
+        async with self._reply_lock:
+            wait = self._last_reply_at + self._reply_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                result = await self._bili.send_reply(
+                    oid=notification.oid,
+                    root=root,
+                    parent=parent,
+                    message=text,
+                )
+            finally:
+                self._last_reply_at = time.monotonic()
         if result.success:
             logger.info(
                 "回复成功: bvid=%s rpid=%d", notification.bvid, result.rpid
@@ -8,6 +8,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 
 from azure.identity import DefaultAzureCredential
@@ -37,6 +38,8 @@ class KeyVaultSecretProvider:
             vault_url=vault_url,
             credential=self._credential,
         )
+        # 已获取的密钥值，避免重复的网络往返
+        self._cache: dict[str, str] = {}
         logger.info("Key Vault 客户端已初始化: %s", vault_url)
 
     def get_secret(self, secret_name: str) -> str:
@@ -52,6 +55,10 @@ class KeyVaultSecretProvider:
             ValueError: 密钥不存在或值为空。
             azure.core.exceptions.HttpResponseError: Key Vault 访问失败。
         """
+        cached = self._cache.get(secret_name)
+        if cached is not None:
+            return cached
+
         logger.debug("正在从 Key Vault 获取密钥: %s", secret_name)
         secret = self._client.get_secret(secret_name)
 
@@ -61,8 +68,25 @@ class KeyVaultSecretProvider:
             )
 
         logger.info("成功获取密钥: %s", secret_name)
+        self._cache[secret_name] = secret.value
         return secret.value
 
+    async def prefetch(self, secret_names: list[str]) -> None:
+        """并发预取多个密钥并缓存，之后的 get_secret 直接返回缓存值.
+
+        同步 SDK 的调用放到线程池中并发执行，N 个密钥只需约 1 次往返的耗时。
+
+        Args:
+            secret_names: 密钥名称列表。
+
+        Raises:
+            ValueError: 任一密钥不存在或值为空。
+        """
+        missing = [n for n in secret_names if n not in self._cache]
+        await asyncio.gather(
+            *(asyncio.to_thread(self.get_secret, name) for name in missing)
+        )
+
     def close(self) -> None:
         """释放 Key Vault 客户端资源."""
         self._client.close()
@@ -10,6 +10,7 @@
 
 from __future__ import annotations
 
+import functools
 import os
 import sys
 from pathlib import Path
@@ -17,6 +18,12 @@ from pathlib import Path
 import yaml
 from pydantic import BaseModel, field_validator
 
+try:
+    # libyaml C 实现，解析速度约为纯 Python SafeLoader 的 10 倍
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - PyYAML 未编译 libyaml 时回退
+    from yaml import SafeLoader as _YamlLoader
+
 
 class AzureOpenAIConfig(BaseModel):
     """Azure OpenAI 相关配置."""
@@ -24,6 +31,7 @@ class AzureOpenAIConfig(BaseModel):
     endpoint: str
     deployment: str = "gpt-52"
     api_version: str = "2025-04-01-preview"
+    embedding_deployment: str = ""  # 为空则不启用语义缓存
 
     @field_validator("endpoint")
     @classmethod
@@ -58,9 +66,11 @@ class BotConfig(BaseModel):
     """机器人行为配置."""
 
     poll_interval: int = 30
+    max_concurrency: int = 3
     max_subtitle_chars: int = 8000
     cache_ttl: int = 86400
     cache_max_size: int = 500
+    semantic_cache_threshold: float = 0.92
     reply_prefix: str = "【AI总结】"
     max_reply_chars: int = 900
 
@@ -89,12 +99,22 @@ def load_config(config_path: str | Path | None = None) -> AppConfig:
     3. config/config.yaml
     4. config.yaml
 
+    配置在进程内视为不可变：同一路径的结果会被缓存，
+    重复调用直接返回同一个 AppConfig 对象，调用方不应修改它。
+
     Args:
         config_path: 配置文件路径（可选）。
 
     Returns:
         AppConfig 对象。
     """
+    # 统一为 str，保证 Path 和 str 形式的同一路径命中同一缓存
+    return _load_config(str(config_path) if config_path else None)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_config(config_path: str | None) -> AppConfig:
+    """load_config 的缓存实现."""
     # 优先从环境变量加载（Azure 部署场景）
     if os.getenv("AZURE_OPENAI_ENDPOINT"):
         return _load_from_env()
@@ -121,8 +141,9 @@ def load_config(config_path: str | Path | None = None) -> AppConfig:
         )
         sys.exit(1)
 
-    with open(path, encoding="utf-8") as f:
-        raw = yaml.safe_load(f)
+    # 以字节读取，由 libyaml 直接解码（自动识别 UTF-8/UTF-16 BOM），省去一层文本包装
+    with open(path, "rb") as f:
+        raw = yaml.load(f, Loader=_YamlLoader)
 
     try:
         return AppConfig(**raw)
@@ -131,6 +152,7 @@ def load_config(config_path: str | Path | None = None) -> AppConfig:
         sys.exit(1)
 
 
+@functools.lru_cache(maxsize=None)
 def _load_from_env() -> AppConfig:
     """从环境变量加载配置（Azure 部署用）.
 
@@ -138,32 +160,44 @@ def _load_from_env() -> AppConfig:
     - AZURE_OPENAI_ENDPOINT
     - AZURE_OPENAI_DEPLOYMENT
     - AZURE_OPENAI_API_VERSION
+    - AZURE_OPENAI_EMBEDDING_DEPLOYMENT
     - KEYVAULT_URL
     - BOT_POLL_INTERVAL
+    - BOT_MAX_CONCURRENCY
     - BOT_MAX_SUBTITLE_CHARS
     - LOG_LEVEL
+
+    各字段已在此处转换为正确类型，使用 model_construct 跳过 pydantic 校验；
+    仅对必填 URL 显式调用校验器，保留占位符检查与首尾空白清理。
     """
-    return AppConfig(
-        azure_openai=AzureOpenAIConfig(
-            endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+    return AppConfig.model_construct(
+        azure_openai=AzureOpenAIConfig.model_construct(
+            endpoint=AzureOpenAIConfig.not_placeholder(
+                os.environ["AZURE_OPENAI_ENDPOINT"]
+            ),
             deployment=os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-52"),
             api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2025-04-01-preview"),
+            embedding_deployment=os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", ""),
         ),
-        keyvault=KeyVaultConfig(
-            vault_url=os.environ["KEYVAULT_URL"],
+        keyvault=KeyVaultConfig.model_construct(
+            vault_url=KeyVaultConfig.not_placeholder(os.environ["KEYVAULT_URL"]),
             api_key_secret_name=os.getenv("KEYVAULT_API_KEY_NAME", "AzureAI--ApiKey"),
             sessdata_secret_name=os.getenv("KEYVAULT_SESSDATA_NAME", "Bili--Sessdata"),
             bili_jct_secret_name=os.getenv("KEYVAULT_BILI_JCT_NAME", "Bili--JCT"),
             uid_secret_name=os.getenv("KEYVAULT_UID_NAME", "Bili--UID"),
         ),
-        bot=BotConfig(
+        bot=BotConfig.model_construct(
             poll_interval=int(os.getenv("BOT_POLL_INTERVAL", "60")),
+            max_concurrency=int(os.getenv("BOT_MAX_CONCURRENCY", "3")),
             max_subtitle_chars=int(os.getenv("BOT_MAX_SUBTITLE_CHARS", "8000")),
             cache_ttl=int(os.getenv("BOT_CACHE_TTL", "86400")),
+            semantic_cache_threshold=float(
+                os.getenv("BOT_SEMANTIC_CACHE_THRESHOLD", "0.92")
+            ),
             reply_prefix=os.getenv("BOT_REPLY_PREFIX", "【AI总结】"),
             max_reply_chars=int(os.getenv("BOT_MAX_REPLY_CHARS", "900")),
         ),
-        logging=LoggingConfig(
+        logging=LoggingConfig.model_construct(
             level=os.getenv("LOG_LEVEL", "INFO"),
         ),
     )
@@ -0,0 +1,80 @@
+"""通用 TTL 缓存 — 各模块缓存共用的底层存储.
+
+利用 dict 保持插入顺序：头部即最早写入（LRU 模式下为最久未使用）的条目，
+容量满时从头部淘汰；写入时顺带从头部清理已过期的条目，均摊 O(1)。
+过期时间统一使用单调时钟的整数纳秒，不受系统时间调整影响。
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Hashable, Iterator
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """带过期时间和容量上限的缓存（FIFO 或 LRU 淘汰）."""
+
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int,
+        *,
+        lru: bool = False,
+        clock: Callable[[], int] = time.monotonic_ns,
+    ) -> None:
+        """初始化缓存.
+
+        Args:
+            ttl:      默认过期时间（秒）。
+            max_size: 最大缓存条数。
+            lru:      True 时命中的条目移到末尾（LRU），否则按写入顺序淘汰（FIFO）。
+            clock:    返回单调时间（纳秒）的时钟函数。
+        """
+        self._ttl_ns = int(ttl * 1_000_000_000)
+        self._max_size = max_size
+        self._lru = lru
+        self._clock = clock
+        self._data: dict[K, tuple[V, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> V | None:
+        """查询未过期的条目，过期则移除并返回 None."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        value, expire_at = entry
+        if self._clock() > expire_at:
+            del self._data[key]
+            return None
+
+        if self._lru:
+            self._data[key] = self._data.pop(key)
+        return value
+
+    def put(self, key: K, value: V, ttl: float | None = None) -> None:
+        """写入条目（可单独指定过期时间，单位秒），容量满时淘汰头部条目."""
+        now = self._clock()
+        data = self._data
+        data.pop(key, None)
+        while data:
+            oldest = next(iter(data))
+            if data[oldest][1] >= now and len(data) < self._max_size:
+                break
+            del data[oldest]
+
+        ttl_ns = self._ttl_ns if ttl is None else int(ttl * 1_000_000_000)
+        data[key] = (value, now + ttl_ns)
+
+    def values(self) -> Iterator[V]:
+        """遍历所有未过期的条目值."""
+        now = self._clock()
+        for value, expire_at in self._data.values():
+            if expire_at >= now:
+                yield value
@@ -0,0 +1,78 @@
+"""AzureOpenAIProvider 流式调用测试."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+import src.ai.azure_openai as azure_openai
+from src.ai.azure_openai import AzureOpenAIProvider
+
+
+class _FakeStream:
+    """先返回一个 delta；fail 为 True 时随后模拟连接中断."""
+
+    def __init__(self, fail: bool) -> None:
+        self._fail = fail
+        self.closed = False
+
+    def __aiter__(self):
+        return self._events()
+
+    async def _events(self):
+        delta = SimpleNamespace(content="总结内容")
+        yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=delta)])
+        if self._fail:
+            raise httpx.ReadError("connection reset")
+        yield SimpleNamespace(usage=None, choices=[])
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class _FakeCompletions:
+    def __init__(self, failures: int) -> None:
+        self._failures = failures
+        self.calls = 0
+
+    async def create(self, **kwargs) -> _FakeStream:
+        self.calls += 1
+        return _FakeStream(fail=self.calls <= self._failures)
+
+
+def _provider(
+    monkeypatch: pytest.MonkeyPatch, failures: int
+) -> tuple[AzureOpenAIProvider, _FakeCompletions]:
+    async def no_sleep(_: float) -> None:
+        pass
+
+    monkeypatch.setattr(azure_openai.asyncio, "sleep", no_sleep)
+    provider = AzureOpenAIProvider("https://example.openai.azure.com", "key", "gpt")
+    completions = _FakeCompletions(failures)
+    provider._client = SimpleNamespace(
+        chat=SimpleNamespace(completions=completions)
+    )
+    return provider, completions
+
+
+@pytest.mark.asyncio
+async def test_stream_interruption_is_retried(monkeypatch: pytest.MonkeyPatch) -> None:
+    provider, completions = _provider(monkeypatch, failures=azure_openai._STREAM_RETRIES)
+
+    result = await provider.summarize_video("视频标题：测试")
+
+    assert result == "总结内容"
+    assert completions.calls == azure_openai._STREAM_RETRIES + 1
+
+
+@pytest.mark.asyncio
+async def test_stream_retries_are_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    provider, completions = _provider(
+        monkeypatch, failures=azure_openai._STREAM_RETRIES + 1
+    )
+
+    with pytest.raises(httpx.ReadError):
+        await provider.summarize_video("视频标题：测试")
+    assert completions.calls == azure_openai._STREAM_RETRIES + 1
@@ -0,0 +1,42 @@
+"""_compress_context 测试."""
+
+from __future__ import annotations
+
+from src.ai.azure_openai import _compress_context
+
+
+def _context(subtitle: str, title: str = "Python 100 100 tips") -> str:
+    return (
+        f"视频标题：{title}\n"
+        "UP主：嗯嗯 嗯嗯\n"
+        "时长：3分0秒\n"
+        "视频简介：重复 重复  两个空格\n"
+        f"视频字幕内容：\n{subtitle}"
+    )
+
+
+def _subtitle_lines(text: str) -> list[str]:
+    return text.split("视频字幕内容：\n", 1)[1].split("\n")
+
+
+def test_header_left_untouched() -> None:
+    text = _context("[00:00] 大家好")
+    compressed = _compress_context(text)
+    assert compressed.split("视频字幕内容：")[0] == text.split("视频字幕内容：")[0]
+
+
+def test_whitespace_collapsed_and_blank_lines_dropped() -> None:
+    text = _context("[00:00]  大家好　\t欢迎  \n   \n[00:30] 开始")
+    assert _subtitle_lines(_compress_context(text)) == ["[00:00] 大家好 欢迎", "[00:30] 开始"]
+
+
+def test_repeated_latin_words_kept() -> None:
+    text = _context("[00:00] I think that that is really really true no no no")
+    assert _subtitle_lines(_compress_context(text)) == [
+        "[00:00] I think that that is really really true no no no"
+    ]
+
+
+def test_no_subtitle_section_unchanged() -> None:
+    text = "视频标题：a  a\nUP主：b\n（该视频没有字幕内容）"
+    assert _compress_context(text) == text
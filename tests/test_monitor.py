@@ -0,0 +1,63 @@
+"""AtMonitor 测试."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from src.bilibili.models import AtNotification
+from src.bot.monitor import AtMonitor
+
+
+class _FakeBili:
+    def __init__(self, notifications: list[AtNotification]) -> None:
+        self._notifications = notifications
+
+    async def fetch_at_notifications(self) -> list[AtNotification]:
+        return self._notifications
+
+
+class _FakeProcessor:
+    """记录同时处理中的通知数峰值."""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+        self.done = 0
+
+    async def process(self, notification: AtNotification) -> bool:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        self.done += 1
+        return True
+
+
+def _notification(at_id: int) -> AtNotification:
+    return AtNotification(
+        at_id=at_id,
+        sender_uid=at_id,
+        sender_name=f"user{at_id}",
+        bvid="BV1xx411c7mD",
+        oid=1,
+        source_id=at_id,
+        root_id=0,
+        content="@bot 总结",
+        timestamp=1000 + at_id,
+    )
+
+
+@pytest.mark.asyncio
+async def test_poll_limits_concurrent_processing() -> None:
+    notifications = [_notification(i) for i in range(20, 0, -1)]
+    processor = _FakeProcessor()
+    monitor = AtMonitor(
+        _FakeBili(notifications), processor, max_concurrency=3  # type: ignore[arg-type]
+    )
+
+    await monitor._poll_once()
+
+    assert processor.done == 20
+    assert processor.peak == 3
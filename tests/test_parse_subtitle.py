@@ -0,0 +1,48 @@
+"""_parse_subtitle 测试."""
+
+from __future__ import annotations
+
+import json
+
+from src.bilibili.client import _parse_subtitle
+
+
+def _raw(*cues: tuple[float, str]) -> bytes:
+    return json.dumps(
+        {"body": [{"from": start, "content": content} for start, content in cues]}
+    ).encode()
+
+
+def test_filler_cues_removed_and_repeats_collapsed() -> None:
+    subtitle = _parse_subtitle(
+        _raw((0, "嗯嗯"), (1, "啊？"), (2, "嗯嗯嗯好的"), (3, "开始吧")), "zh"
+    )
+    assert subtitle is not None
+    assert subtitle.body == "嗯好的 开始吧"
+    assert subtitle.body_with_time == "[00:00] 嗯好的 开始吧"
+
+
+def test_adjacent_duplicate_cues_dropped() -> None:
+    subtitle = _parse_subtitle(
+        _raw((0, "今天讲装饰器"), (1, "今天讲装饰器"), (2, "然后讲闭包"), (3, "今天讲装饰器")),
+        "zh",
+    )
+    assert subtitle is not None
+    assert subtitle.body == "今天讲装饰器 然后讲闭包 今天讲装饰器"
+
+
+def test_repeated_words_inside_latin_cue_kept() -> None:
+    subtitle = _parse_subtitle(
+        _raw((0, "I think that that is"), (1, "really really true"), (2, "no no no")),
+        "en",
+    )
+    assert subtitle is not None
+    assert subtitle.body == "I think that that is really really true no no no"
+
+
+def test_filler_only_segment_produces_no_line() -> None:
+    subtitle = _parse_subtitle(
+        _raw((0, "开场"), (31, "嗯嗯"), (35, "啊啊"), (61, "结束")), "zh"
+    )
+    assert subtitle is not None
+    assert subtitle.body_with_time == "[00:00] 开场\n[01:00] 结束"
@@ -0,0 +1,78 @@
+"""MessageProcessor 测试."""
+
+from __future__ import annotations
+
+import pytest
+
+from src.bot.processor import MessageProcessor
+
+
+@pytest.fixture
+def processor() -> MessageProcessor:
+    return MessageProcessor(None, None, None)  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        ("@bot_1 总结一下", "总结一下"),
+        ("总结一下 @bot_1", "总结一下"),
+        ("what does @bot_1 think about RAG", "what does think about RAG"),
+        ("这个@bot_1 讲了啥", "这个 讲了啥"),
+        ("@a @b", ""),
+    ],
+)
+def test_extract_user_question(
+    processor: MessageProcessor, content: str, expected: str
+) -> None:
+    assert processor._extract_user_question(content) == expected
+
+
+class _FakeBili:
+    """按预设结果依次返回关注状态的假 B站 客户端."""
+
+    def __init__(self, *results: bool | None) -> None:
+        self._results = list(results)
+        self.calls = 0
+
+    async def is_user_following_me(self, uid: int) -> bool | None:
+        self.calls += 1
+        return self._results.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_follower_result_is_cached() -> None:
+    bili = _FakeBili(True)
+    processor = MessageProcessor(bili, None, None)  # type: ignore[arg-type]
+
+    assert await processor._is_following(1) is True
+    assert await processor._is_following(1) is True
+    assert bili.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_follower_check_failure_allows_but_is_not_cached() -> None:
+    bili = _FakeBili(None, False)
+    processor = MessageProcessor(bili, None, None)  # type: ignore[arg-type]
+
+    assert await processor._is_following(1) is True
+    assert await processor._is_following(1) is False
+    assert bili.calls == 2
+
+
+@pytest.mark.parametrize("max_reply_chars", [1, 3, 8, 10, 11, 12, 900])
+@pytest.mark.parametrize("length", [0, 5, 20, 2000])
+def test_format_reply_never_exceeds_limit(max_reply_chars: int, length: int) -> None:
+    processor = MessageProcessor(
+        None, None, None, max_reply_chars=max_reply_chars  # type: ignore[arg-type]
+    )
+    reply = processor._format_reply("字" * length)
+
+    assert len(reply) <= max(max_reply_chars, 3)
+
+
+def test_format_reply_truncates_after_prefix() -> None:
+    processor = MessageProcessor(
+        None, None, None, reply_prefix="【AI】", max_reply_chars=12  # type: ignore[arg-type]
+    )
+    assert processor._format_reply("一二三四五六七八九十") == "【AI】\n一二三四..."
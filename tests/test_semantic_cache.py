@@ -0,0 +1,81 @@
+"""SemanticAIProvider 测试."""
+
+from __future__ import annotations
+
+import pytest
+
+from src.ai.base import AIProvider
+from src.ai.semantic_cache import SemanticAIProvider
+
+
+class _FakeProvider(AIProvider):
+    """记录调用次数的假 AI 提供商."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def summarize_video(self, video_context: str) -> str:
+        self.calls += 1
+        return f"总结:{video_context.split(chr(10), 1)[0]}"
+
+    async def answer_question(self, video_context: str, question: str) -> str:
+        self.calls += 1
+        return f"回答:{video_context.split(chr(10), 1)[0]}:{question}"
+
+    async def close(self) -> None:
+        pass
+
+
+async def _same_vector(texts: list[str]) -> list[list[float]]:
+    """任何文本都返回同一向量，模拟最坏情况下的语义相似."""
+    return [[1.0, 0.0] for _ in texts]
+
+
+def _context(title: str) -> str:
+    return (
+        f"视频标题：{title}\n"
+        "UP主：同一个UP\n"
+        "时长：10分0秒\n"
+        "视频字幕内容：\n"
+        "[00:00] 大家好 欢迎收看本系列"
+    )
+
+
+@pytest.mark.asyncio
+async def test_different_videos_never_share_summary() -> None:
+    provider = _FakeProvider()
+    cached = SemanticAIProvider(provider, _same_vector)
+
+    first = await cached.summarize_video(_context("系列教程 第1集"))
+    second = await cached.summarize_video(_context("系列教程 第2集"))
+
+    assert first != second
+    assert provider.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_question_cache_scoped_to_video() -> None:
+    provider = _FakeProvider()
+    cached = SemanticAIProvider(provider, _same_vector)
+
+    ep1 = await cached.answer_question(_context("系列教程 第1集"), "讲了什么")
+    ep2 = await cached.answer_question(_context("系列教程 第2集"), "讲了什么")
+    again = await cached.answer_question(_context("系列教程 第1集"), "讲了啥")
+
+    assert ep1 != ep2
+    assert again == ep1
+    assert provider.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_only_question_is_embedded() -> None:
+    embedded: list[list[str]] = []
+
+    async def recording_embedder(texts: list[str]) -> list[list[float]]:
+        embedded.append(texts)
+        return await _same_vector(texts)
+
+    cached = SemanticAIProvider(_FakeProvider(), recording_embedder)
+    await cached.answer_question(_context("系列教程 第1集"), "讲了什么")
+
+    assert embedded == [["讲了什么"]]
@@ -0,0 +1,76 @@
+"""TTLCache 测试."""
+
+from __future__ import annotations
+
+from src.ttl_cache import TTLCache
+
+_SECOND = 1_000_000_000
+
+
+class _Clock:
+    """可手动推进的假时钟（纳秒）."""
+
+    def __init__(self) -> None:
+        self.now = 0
+
+    def __call__(self) -> int:
+        return self.now
+
+
+def test_entries_expire_after_ttl() -> None:
+    clock = _Clock()
+    cache: TTLCache[str, str] = TTLCache(10, 10, clock=clock)
+    cache.put("a", "1")
+
+    clock.now = 10 * _SECOND
+    assert cache.get("a") == "1"
+    clock.now = 10 * _SECOND + 1
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_per_entry_ttl() -> None:
+    clock = _Clock()
+    cache: TTLCache[int, bool] = TTLCache(3600, 10, clock=clock)
+    cache.put(1, True)
+    cache.put(2, False, ttl=300)
+
+    clock.now = 301 * _SECOND
+    assert cache.get(1) is True
+    assert cache.get(2) is None
+
+
+def test_fifo_evicts_oldest_write() -> None:
+    cache: TTLCache[str, int] = TTLCache(60, 2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.get("c") == 3
+
+
+def test_lru_evicts_least_recently_used() -> None:
+    cache: TTLCache[str, int] = TTLCache(60, 2, lru=True)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+
+def test_put_purges_expired_head_and_values_skip_expired() -> None:
+    clock = _Clock()
+    cache: TTLCache[str, int] = TTLCache(10, 10, clock=clock)
+    cache.put("old", 1)
+    clock.now = 5 * _SECOND
+    cache.put("new", 2)
+
+    clock.now = 11 * _SECOND
+    assert list(cache.values()) == [2]
+    cache.put("newer", 3)
+    assert len(cache) == 2